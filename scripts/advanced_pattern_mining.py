@@ -9,60 +9,79 @@ This script automatically discovers:
 4. Optimal combinations with zero false positives
 """
 
+import heapq
+import multiprocessing as mp
 import re
 from collections import Counter, defaultdict
-from typing import List, Set, Tuple, Dict
+from functools import partial
+from typing import Callable, Iterator, List, Optional, Set, Tuple, Dict
+
+
+# Tokenizer regexes, compiled once instead of on every call
+_TLD_RE = re.compile(r'\.[a-z0-9]+$')
+_SEP_RE = re.compile(r'[-_.]')
+_WORD_RE = re.compile(r'[a-z]{3,}')
+
+# Separator patterns counted by _count_separator_patterns
+_SEPARATOR_PATTERNS = [
+    (re.compile(r'([a-z]{3,})-([a-z]{3,})'), "word-word"),                # x-x
+    (re.compile(r'([a-z]{3,})-([a-z]{3,})-([a-z]{3,})'), "word-word-word"),  # x-x-x
+    (re.compile(r'([a-z]{3,})_([a-z]{3,})'), "word_word"),                # x_x
+]
+
+# Numeric runs, counted by _count_separator_patterns as ("numbers", run)
+_DIGIT_RE = re.compile(r'\d+')
+
+# Concatenated repetitions s[k:k+L] == s[k+L:k+2L] for word lengths 3-7.
+# The zero-width lookahead reports every start position k, overlapping ones
+# included, and the regex engine skips non-candidates without Python code.
+_REPETITION_RES = [re.compile(rf'(?=(.{{{length}}})\1)', re.DOTALL) for length in range(3, 8)]
+
+# Domains per worker task in the parallel scans
+CHUNK_SIZE = 50_000
+
+# Counters produced by mine_all's single scan, in the order _mine_chunk returns them
+_MINED_COUNTERS = ("words", "bigrams", "separators", "repetitions")
 
 
 def load_domains(file_path="/tmp/porn_domains.txt") -> List[str]:
-    """Load cached domain list."""
-    with open(file_path, 'r') as f:
-        return [line.strip() for line in f if line.strip()]
+    """Load cached domain list, lowercased once for every consumer."""
+    # Read and split the file in one call instead of iterating line objects
+    with open(file_path, 'rb') as f:
+        lines = f.read().decode('utf-8').lower().split('\n')
+    return [domain for domain in map(str.strip, lines) if domain]
 
 
 def tokenize_domain(domain: str) -> List[str]:
     """
     Tokenize domain into words, handling various separators.
 
+    Expects a lowercased domain, as returned by load_domains.
+
     Examples:
         "watch-sex-videos.com" -> ["watch", "sex", "videos"]
         "freepornhub.net" -> ["free", "porn", "hub"]  (attempt split)
     """
     # Remove TLD
-    domain_core = re.sub(r'\.[a-z0-9]+$', '', domain.lower())
+    domain_core = _TLD_RE.sub('', domain)
 
     # Split on separators
-    parts = re.split(r'[-_.]', domain_core)
+    parts = _SEP_RE.split(domain_core)
 
     # Extract alphabetic tokens (3+ chars)
     tokens = []
     for part in parts:
         # Extract all alphabetic sequences of 3+ chars
-        words = re.findall(r'[a-z]{3,}', part)
+        words = _WORD_RE.findall(part)
         tokens.extend(words)
 
     return tokens
 
 
-def discover_frequent_words(domains: List[str], min_count: int = 500) -> Dict[str, int]:
-    """
-    Discover all frequent words in domains.
-    Returns word -> count mapping.
-    """
-    word_counter = Counter()
-
-    print(f"Tokenizing {len(domains):,} domains...")
-    for i, domain in enumerate(domains):
-        if i % 100000 == 0:
-            print(f"  Progress: {i:,}/{len(domains):,}")
-
-        tokens = tokenize_domain(domain)
-        for token in tokens:
-            if len(token) >= 3:
-                word_counter[token] += 1
-
-    print()
-    return {word: count for word, count in word_counter.items() if count >= min_count}
+def _chunked(domains: List[str], size: int) -> Iterator[List[str]]:
+    """Split domains into consecutive chunks of at most size domains."""
+    for start in range(0, len(domains), size):
+        yield domains[start:start + size]
 
 
 def categorize_words(word_counts: Dict[str, int]) -> Dict[str, List[str]]:
@@ -88,6 +107,8 @@ def categorize_words(word_counts: Dict[str, int]) -> Dict[str, List[str]]:
         "lesbian", "trans", "milf", "teen", "anal", "oral", "bdsm",
         "fetish", "erotic", "escort", "strip", "hentai",
     }
+    # One alternation scans each word once instead of once per indicator
+    adult_indicator_re = re.compile('|'.join(map(re.escape, sorted(adult_indicators))))
 
     # Action verbs (common in adult content)
     action_indicators = {
@@ -107,7 +128,7 @@ def categorize_words(word_counts: Dict[str, int]) -> Dict[str, List[str]]:
         if word in action_indicators:
             verbs.append(word)
         # Check if it contains adult indicators
-        elif any(indicator in word for indicator in adult_indicators):
+        elif adult_indicator_re.search(word):
             explicit.append(word)
             # Also categorize as noun if it's a base word
             if word in adult_indicators:
@@ -120,93 +141,203 @@ def categorize_words(word_counts: Dict[str, int]) -> Dict[str, List[str]]:
     }
 
 
-def find_ngram_patterns(domains: List[str], n: int = 2, min_count: int = 50) -> Counter:
+def _count_ngrams(
+    token_lists: List[List[str]],
+    n: int,
+    prefixes: Optional[Set[Tuple[str, ...]]],
+) -> Counter:
     """
-    Find n-gram patterns (2-word, 3-word, etc.) in domains.
+    Count the n-grams of already tokenized domains.
 
-    Returns: Counter of (word1, word2, ...) tuples
+    If prefixes is given, only n-grams whose leading (n-1)-gram is in it
+    are counted (Intergrams-style pruning). An n-gram never occurs more
+    often than its prefix, so passing every (n-1)-gram with at least
+    min_count occurrences loses nothing while skipping most increments.
     """
     ngram_counter = Counter()
 
-    print(f"Finding {n}-gram patterns (min {min_count} occurrences)...")
-    for i, domain in enumerate(domains):
-        if i % 100000 == 0:
-            print(f"  Progress: {i:,}/{len(domains):,}")
+    for tokens in token_lists:
+        if len(tokens) < n:
+            # No n-gram: skip the zip/update setup entirely
+            continue
 
-        tokens = tokenize_domain(domain)
+        # Generate n-grams: zip builds the tuples and Counter.update counts
+        # them in C, instead of a slice + tuple + increment per n-gram
+        ngrams = zip(*[tokens[j:] for j in range(n)])
+        if prefixes is not None:
+            ngrams = (ngram for ngram in ngrams if ngram[:-1] in prefixes)
+        ngram_counter.update(ngrams)
 
-        # Generate n-grams
-        for j in range(len(tokens) - n + 1):
-            ngram = tuple(tokens[j:j+n])
-            ngram_counter[ngram] += 1
+    return ngram_counter
 
-    print()
-    return Counter({ng: c for ng, c in ngram_counter.items() if c >= min_count})
 
+def _count_separator_patterns(pattern_counter: Counter, domain: str) -> None:
+    """Add the separator patterns of one domain: x-x, x-x-x, x_x and digit runs."""
+    for pattern_re, pattern_name in _SEPARATOR_PATTERNS:
+        for match in pattern_re.findall(domain):
+            pattern_counter[(pattern_name, match)] += 1
 
-def find_separator_patterns(domains: List[str], min_count: int = 100) -> Counter:
-    """
-    Find patterns with specific separators: x-x, x-x-x, x_x, etc.
-    """
-    pattern_counter = Counter()
+    # Numeric patterns: walk the runs without building a match list
+    for match in _DIGIT_RE.finditer(domain):
+        pattern_counter[("numbers", match.group())] += 1
 
-    print(f"Finding separator patterns (min {min_count} occurrences)...")
 
-    # Patterns to look for
-    patterns = [
-        (r'([a-z]{3,})-([a-z]{3,})', "word-word"),           # x-x
-        (r'([a-z]{3,})-([a-z]{3,})-([a-z]{3,})', "word-word-word"),  # x-x-x
-        (r'([a-z]{3,})_([a-z]{3,})', "word_word"),           # x_x
-        (r'(\d+)', "numbers"),                                # numeric patterns
-    ]
+def _count_repetitions(repetition_counter: Counter, domain: str, tokens: List[str]) -> None:
+    """Add the word repetition patterns of one domain: xxx, sexsex, camcam, etc."""
+    # Look for repeated words
+    for j in range(len(tokens) - 1):
+        if tokens[j] == tokens[j + 1]:
+            repetition_counter[("repeat", tokens[j])] += 1
 
-    for i, domain in enumerate(domains):
-        if i % 100000 == 0:
-            print(f"  Progress: {i:,}/{len(domains):,}")
+    # Look for concatenated repetitions in domain
+    for repetition_re in _REPETITION_RES:
+        for substr in repetition_re.findall(domain):
+            if substr.isalpha():
+                repetition_counter[("concat", substr)] += 1
 
-        domain_lower = domain.lower()
 
-        for pattern_re, pattern_name in patterns:
-            matches = re.findall(pattern_re, domain_lower)
-            for match in matches:
-                if isinstance(match, tuple):
-                    pattern_counter[(pattern_name, match)] += 1
-                else:
-                    pattern_counter[(pattern_name, match)] += 1
+def mine_all(domains: List[str], trigram_min_count: int = 30) -> Dict[str, Counter]:
+    """
+    Count words, 2-grams, 3-grams, separator and repetition patterns.
+
+    Words, 2-grams, separator and repetition patterns come from a single
+    scan in which each domain is tokenized once and feeds every counter.
+    3-grams need the 2-gram totals first: only those whose leading 2-gram
+    occurs at least trigram_min_count times are counted, so rare 3-grams
+    are never stored and every 3-gram reaching that threshold is still
+    exact. They are counted afterwards from the tokens the scan kept for
+    domains with 3+ words, so no domain is tokenized twice.
+    Counters are returned under the keys "words", "bigrams", "trigrams",
+    "separators" and "repetitions"; callers apply their own min_count
+    thresholds.
+    """
+    print(f"Mining patterns in {len(domains):,} domains...")
+    totals = {name: Counter() for name in _MINED_COUNTERS}
+    trigram_tokens = []
+    done = 0
+
+    with mp.Pool() as pool:
+        for counters, chunk_tokens in pool.imap(_mine_chunk, _chunked(domains, CHUNK_SIZE)):
+            for name, counter in counters.items():
+                totals[name].update(counter)
+            trigram_tokens.extend(chunk_tokens)
+            done = min(done + CHUNK_SIZE, len(domains))
+            print(f"  Progress: {done:,}/{len(domains):,}")
+    print()
+
+    print(f"Counting 3-grams (min {trigram_min_count} occurrences)...")
+    prefixes = {bigram for bigram, c in totals["bigrams"].items() if c >= trigram_min_count}
+    totals["trigrams"] = _count_ngrams(trigram_tokens, 3, prefixes)
 
     print()
-    return Counter({p: c for p, c in pattern_counter.items() if c >= min_count})
+    return totals
 
 
-def find_repetition_patterns(domains: List[str], min_count: int = 50) -> Counter:
+def _mine_chunk(domains: List[str]) -> Tuple[Dict[str, Counter], List[List[str]]]:
     """
-    Find word repetition patterns: xxx, sexsex, camcam, etc.
+    Run the single-scan mine_all counters over one chunk of domains.
+
+    Also returns the tokens of the domains long enough to hold a 3-gram.
     """
+    word_counter = Counter()
+    bigram_counter = Counter()
+    pattern_counter = Counter()
     repetition_counter = Counter()
+    trigram_tokens = []
 
-    print(f"Finding repetition patterns (min {min_count} occurrences)...")
+    for domain in domains:
+        tokens = tokenize_domain(domain)
 
-    for i, domain in enumerate(domains):
-        if i % 100000 == 0:
-            print(f"  Progress: {i:,}/{len(domains):,}")
+        word_counter.update(tokens)
+        if len(tokens) >= 2:
+            bigram_counter.update(zip(tokens, tokens[1:]))
+            if len(tokens) >= 3:
+                trigram_tokens.append(tokens)
 
-        tokens = tokenize_domain(domain)
+        _count_separator_patterns(pattern_counter, domain)
+        _count_repetitions(repetition_counter, domain, tokens)
 
-        # Look for repeated words
-        for j in range(len(tokens) - 1):
-            if tokens[j] == tokens[j + 1]:
-                repetition_counter[("repeat", tokens[j])] += 1
+    counters = dict(zip(_MINED_COUNTERS, (word_counter, bigram_counter,
+                                          pattern_counter, repetition_counter)))
+    return counters, trigram_tokens
 
-        # Look for concatenated repetitions in domain
-        domain_lower = domain.lower()
-        for length in range(3, 8):  # Word length 3-7
-            for k in range(len(domain_lower) - length * 2 + 1):
-                substr = domain_lower[k:k+length]
-                if substr.isalpha() and domain_lower[k:k+length*2] == substr * 2:
-                    repetition_counter[("concat", substr)] += 1
 
-    print()
-    return Counter({p: c for p, c in repetition_counter.items() if c >= min_count})
+def _at_least(counter: Counter, min_count: int) -> Counter:
+    """Keep the entries of counter that occur at least min_count times."""
+    return Counter({key: c for key, c in counter.items() if c >= min_count})
+
+
+def compile_coverage_matcher(pattern: Tuple, pattern_type: str) -> Optional[Callable]:
+    """
+    Build the matcher for one coverage pattern, compiled once per pattern.
+
+    Returns a predicate taking a domain, or None if the pattern
+    type has no coverage rule. Regex patterns are guarded by plain substring
+    checks on their words, so the regex only runs on domains that contain
+    every word; most domains are rejected by the C substring search alone.
+    """
+    if pattern_type == "bigram":
+        word1, word2 = pattern
+        # Both words in sequence
+        search = re.compile(rf'{word1}(?:[-_.]|[a-z]{{0,4}})?{word2}').search
+        return lambda domain: word2 in domain and word1 in domain and search(domain)
+
+    if pattern_type == "trigram":
+        word1, word2, word3 = pattern
+        # All three words in sequence
+        search = re.compile(
+            rf'{word1}(?:[-_.]|[a-z]{{0,4}})?{word2}(?:[-_.]|[a-z]{{0,4}})?{word3}'
+        ).search
+        return lambda domain: (
+            word3 in domain and word2 in domain and word1 in domain and search(domain)
+        )
+
+    if pattern_type == "separator":
+        sep_type, words = pattern
+        if sep_type == "word-word":
+            needle = f"{words[0]}-{words[1]}"
+            return lambda domain: needle in domain
+        if sep_type == "word-word-word":
+            needle = f"{words[0]}-{words[1]}-{words[2]}"
+            return lambda domain: needle in domain
+
+    if pattern_type == "repetition":
+        rep_type, word = pattern
+        if rep_type == "repeat":
+            search = re.compile(rf'{word}[-_.]?{word}').search
+            return lambda domain: word in domain and search(domain)
+        if rep_type == "concat":
+            needle = word * 2
+            return lambda domain: needle in domain
+
+    return None
+
+
+# Domain list shared with coverage workers, set once per worker process
+_coverage_domains: List[str] = []
+
+
+def _init_coverage_worker(domains: List[str]) -> None:
+    global _coverage_domains
+    _coverage_domains = domains
+
+
+def _pattern_coverage(pattern: Tuple, pattern_type: str) -> Tuple[int, List[str]]:
+    """Count the worker's domains matching one pattern, with up to 5 examples."""
+    matcher = compile_coverage_matcher(pattern, pattern_type)
+    if matcher is None:
+        return 0, []
+
+    count = 0
+    examples = []
+
+    for domain in _coverage_domains:
+        if matcher(domain):
+            count += 1
+            if len(examples) < 5:
+                examples.append(domain)
+
+    return count, examples
 
 
 def analyze_pattern_coverage(
@@ -216,54 +347,16 @@ def analyze_pattern_coverage(
 ) -> Dict:
     """
     Analyze how many domains each pattern covers.
+
+    Patterns are independent sweeps over the same domains, so they are
+    spread across a process pool; each worker receives the domain list once.
     """
     coverage = {}
 
-    for pattern in patterns:
-        count = 0
-        examples = []
-
-        for domain in domains:
-            matched = False
-
-            if pattern_type == "bigram":
-                word1, word2 = pattern
-                # Check if both words appear in sequence
-                if re.search(rf'{word1}(?:[-_.]|[a-z]{{0,4}})?{word2}', domain.lower()):
-                    matched = True
-
-            elif pattern_type == "trigram":
-                word1, word2, word3 = pattern
-                # Check if all three words appear in sequence
-                if re.search(
-                    rf'{word1}(?:[-_.]|[a-z]{{0,4}})?{word2}(?:[-_.]|[a-z]{{0,4}})?{word3}',
-                    domain.lower()
-                ):
-                    matched = True
-
-            elif pattern_type == "separator":
-                sep_type, words = pattern
-                if sep_type == "word-word":
-                    if f"{words[0]}-{words[1]}" in domain.lower():
-                        matched = True
-                elif sep_type == "word-word-word":
-                    if f"{words[0]}-{words[1]}-{words[2]}" in domain.lower():
-                        matched = True
-
-            elif pattern_type == "repetition":
-                rep_type, word = pattern
-                if rep_type == "repeat":
-                    if re.search(rf'{word}[-_.]?{word}', domain.lower()):
-                        matched = True
-                elif rep_type == "concat":
-                    if word * 2 in domain.lower():
-                        matched = True
-
-            if matched:
-                count += 1
-                if len(examples) < 5:
-                    examples.append(domain)
+    with mp.Pool(initializer=_init_coverage_worker, initargs=(domains,)) as pool:
+        results = pool.map(partial(_pattern_coverage, pattern_type=pattern_type), patterns)
 
+    for pattern, (count, examples) in zip(patterns, results):
         if count > 0:
             coverage[pattern] = {
                 "count": count,
@@ -285,18 +378,21 @@ def main():
     print(f"Total domains: {len(domains):,}")
     print()
 
+    # Every step below reads from this one fused scan
+    mined = mine_all(domains, trigram_min_count=30)
+
     # Step 1: Discover frequent words
     print("=" * 80)
     print("STEP 1: DISCOVERING FREQUENT WORDS")
     print("=" * 80)
     print()
 
-    word_counts = discover_frequent_words(domains, min_count=500)
+    word_counts = _at_least(mined["words"], 500)
     print(f"Found {len(word_counts):,} frequent words (500+ occurrences)")
     print()
 
     # Show top 50
-    top_words = sorted(word_counts.items(), key=lambda x: x[1], reverse=True)[:50]
+    top_words = heapq.nlargest(50, word_counts.items(), key=lambda x: x[1])
     print("Top 50 words:")
     for word, count in top_words:
         pct = (count / len(domains)) * 100
@@ -329,11 +425,11 @@ def main():
     print("=" * 80)
     print()
 
-    bigrams = find_ngram_patterns(domains, n=2, min_count=50)
+    bigrams = _at_least(mined["bigrams"], 50)
     print(f"Found {len(bigrams):,} 2-word patterns (50+ occurrences)")
     print()
 
-    top_bigrams = sorted(bigrams.items(), key=lambda x: x[1], reverse=True)[:30]
+    top_bigrams = heapq.nlargest(30, bigrams.items(), key=lambda x: x[1])
     print("Top 30 2-word patterns:")
     for ngram, count in top_bigrams:
         pct = (count / len(domains)) * 100
@@ -346,11 +442,11 @@ def main():
     print("=" * 80)
     print()
 
-    trigrams = find_ngram_patterns(domains, n=3, min_count=30)
+    trigrams = _at_least(mined["trigrams"], 30)
     print(f"Found {len(trigrams):,} 3-word patterns (30+ occurrences)")
     print()
 
-    top_trigrams = sorted(trigrams.items(), key=lambda x: x[1], reverse=True)[:20]
+    top_trigrams = heapq.nlargest(20, trigrams.items(), key=lambda x: x[1])
     print("Top 20 3-word patterns:")
     for ngram, count in top_trigrams:
         pct = (count / len(domains)) * 100
@@ -363,7 +459,7 @@ def main():
     print("=" * 80)
     print()
 
-    separator_patterns = find_separator_patterns(domains, min_count=100)
+    separator_patterns = _at_least(mined["separators"], 100)
     print(f"Found {len(separator_patterns):,} separator patterns (100+ occurrences)")
     print()
 
@@ -375,7 +471,7 @@ def main():
     for ptype in ["word-word", "word-word-word"]:
         if ptype in by_type:
             print(f"{ptype} patterns (top 20):")
-            sorted_patterns = sorted(by_type[ptype], key=lambda x: x[1], reverse=True)[:20]
+            sorted_patterns = heapq.nlargest(20, by_type[ptype], key=lambda x: x[1])
             for words, count in sorted_patterns:
                 pct = (count / len(domains)) * 100
                 if isinstance(words, tuple):
@@ -391,7 +487,7 @@ def main():
     print("=" * 80)
     print()
 
-    repetitions = find_repetition_patterns(domains, min_count=50)
+    repetitions = _at_least(mined["repetitions"], 50)
     print(f"Found {len(repetitions):,} repetition patterns (50+ occurrences)")
     print()
 
@@ -402,7 +498,7 @@ def main():
     for rtype in ["concat", "repeat"]:
         if rtype in by_rep_type:
             print(f"{rtype} patterns (top 20):")
-            sorted_reps = sorted(by_rep_type[rtype], key=lambda x: x[1], reverse=True)[:20]
+            sorted_reps = heapq.nlargest(20, by_rep_type[rtype], key=lambda x: x[1])
             for word, count in sorted_reps:
                 pct = (count / len(domains)) * 100
                 example = word * 2 if rtype == "concat" else f"{word}-{word}"
@@ -9,13 +9,26 @@ This script:
 4. Generates heuristic rules with near-zero false positive rate
 """
 
+import heapq
+import os
 import re
+import shutil
 import sys
 from collections import Counter, defaultdict
 from typing import Set, List, Tuple, Dict
 import urllib.request
 import json
 
+# Tokenizer regexes, compiled once instead of on every call
+_TLD_RE = re.compile(r'\.[a-z]+$')
+_SEP_RE = re.compile(r'[-_.]')
+_CAMEL_RE = re.compile(r'[a-z]+|[0-9]+')
+
+# Bulk keyword scan over a newline-joined domain list: the TLD at the end of
+# each line, and the 3+ char letter/digit runs extract_tokens would keep
+_TLD_LINE_RE = re.compile(r'\.[a-z]+$', re.MULTILINE)
+_KEYWORD_RE = re.compile(r'[a-z]{3,}|[0-9]{3,}')
+
 # Download domain list
 PORN_DOMAINS_URL = "https://raw.githubusercontent.com/Bon-Appetit/porn-domains/main/block.5994458652.9y8bk8.txt"
 
@@ -46,48 +59,71 @@ STRONG_KEYWORDS = {
 }
 
 
+def load_domains(file_path="/tmp/porn_domains.txt") -> List[str]:
+    """Load cached domain list, lowercased once for every consumer."""
+    # Read and split the file in one call instead of iterating line objects
+    with open(file_path, 'rb') as f:
+        lines = f.read().decode('utf-8').lower().split('\n')
+    return [domain for domain in map(str.strip, lines) if domain]
+
+
 def download_domains(cache_file="/tmp/porn_domains.txt") -> List[str]:
     """Download or load cached domain list."""
     try:
-        with open(cache_file, 'r') as f:
-            domains = [line.strip() for line in f if line.strip()]
-            print(f"✓ Loaded {len(domains)} domains from cache: {cache_file}")
-            return domains
+        domains = load_domains(cache_file)
+        print(f"✓ Loaded {len(domains)} domains from cache: {cache_file}")
+        return domains
     except FileNotFoundError:
         print(f"✗ Cache not found, downloading from {PORN_DOMAINS_URL}")
-        with urllib.request.urlopen(PORN_DOMAINS_URL) as response:
-            content = response.read().decode('utf-8')
-            domains = [line.strip() for line in content.split('\n') if line.strip()]
-            with open(cache_file, 'w') as f:
-                f.write('\n'.join(domains))
-            print(f"✓ Downloaded and cached {len(domains)} domains")
-            return domains
+        # Stream the body to disk in 1 MB chunks; the rename keeps a failed
+        # download from leaving a truncated cache behind
+        partial_file = cache_file + ".part"
+        with urllib.request.urlopen(PORN_DOMAINS_URL) as response, open(partial_file, 'wb') as f:
+            shutil.copyfileobj(response, f, 1 << 20)
+        os.replace(partial_file, cache_file)
+        domains = load_domains(cache_file)
+        print(f"✓ Downloaded and cached {len(domains)} domains")
+        return domains
 
 
 def extract_tokens(domain: str) -> List[str]:
     """
     Extract meaningful tokens from a domain.
 
+    Expects a lowercased domain, as returned by load_domains.
+
     Examples:
         "watch-porn-videos.com" -> ["watch", "porn", "videos"]
         "freexxxmovies.net" -> ["free", "xxx", "movies"]
     """
     # Remove TLD
-    domain_without_tld = re.sub(r'\.[a-z]+$', '', domain.lower())
+    domain_without_tld = _TLD_RE.sub('', domain)
 
     # Split on common separators
-    tokens = re.split(r'[-_.]', domain_without_tld)
+    tokens = _SEP_RE.split(domain_without_tld)
 
     # Further split camelCase and number boundaries
     expanded = []
     for token in tokens:
         # Split on transitions: lowercase->uppercase, letter->number
-        parts = re.findall(r'[a-z]+|[0-9]+', token)
+        parts = _CAMEL_RE.findall(token)
         expanded.extend(parts)
 
     return [t for t in expanded if len(t) >= 2]  # Filter very short tokens
 
 
+def compile_alternation(words) -> re.Pattern:
+    """Compile words into one regex that finds any of them in a single scan."""
+    words = sorted(words)
+    if not words:
+        return re.compile(r'(?!)')  # an empty alternation would match everything
+    return re.compile("|".join(map(re.escape, words)))
+
+
+_EXPLICIT_RE = compile_alternation(["sex", "porn", "xxx", "nude", "naked"])
+_UNAMBIGUOUS_RE = compile_alternation(["porn", "xxx", "sex", "nude", "adult", "hentai"])
+
+
 def is_likely_legitimate(word: str) -> bool:
     """Check if a word is likely legitimate (not adult content)."""
     return word in COMMON_LEGITIMATE_WORDS
@@ -95,13 +131,9 @@ def is_likely_legitimate(word: str) -> bool:
 
 def analyze_single_keywords(domains: List[str]) -> Dict[str, int]:
     """Extract and count single keyword occurrences."""
-    keyword_counts = Counter()
-
-    for domain in domains:
-        tokens = extract_tokens(domain)
-        for token in tokens:
-            if len(token) >= 3:  # At least 3 characters
-                keyword_counts[token] += 1
+    # One findall over the whole list instead of extract_tokens per domain
+    blob = _TLD_LINE_RE.sub('', '\n'.join(domains))
+    keyword_counts = Counter(_KEYWORD_RE.findall(blob))
 
     return dict(keyword_counts)
 
@@ -112,9 +144,7 @@ def analyze_bigrams(domains: List[str]) -> Dict[Tuple[str, str], int]:
 
     for domain in domains:
         tokens = extract_tokens(domain)
-        for i in range(len(tokens) - 1):
-            bigram = (tokens[i], tokens[i + 1])
-            bigram_counts[bigram] += 1
+        bigram_counts.update(zip(tokens, tokens[1:]))
 
     return dict(bigram_counts)
 
@@ -151,7 +181,7 @@ def categorize_keywords(keyword_counts: Dict[str, int], min_count: int = 100) ->
             categories["verbs"].append(word)
         elif word in nouns:
             categories["nouns"].append(word)
-        elif any(x in word for x in ["sex", "porn", "xxx", "nude", "naked"]):
+        elif _EXPLICIT_RE.search(word):
             categories["explicit"].append(word)
 
     return categories
@@ -198,7 +228,7 @@ def main():
     print(f"      Unique tokens found: {len(keyword_counts):,}")
 
     # Show top keywords
-    top_keywords = sorted(keyword_counts.items(), key=lambda x: x[1], reverse=True)[:30]
+    top_keywords = heapq.nlargest(30, keyword_counts.items(), key=lambda x: x[1])
     print("\n      Top 30 keywords:")
     for word, count in top_keywords:
         pct = (count / len(domains)) * 100
@@ -212,7 +242,7 @@ def main():
     for cat_name, words in categories.items():
         if words:
             print(f"\n      {cat_name.upper()} ({len(words)} words):")
-            print(f"        {', '.join(sorted(words)[:20])}")
+            print(f"        {', '.join(heapq.nsmallest(20, words))}")
             if len(words) > 20:
                 print(f"        ... and {len(words) - 20} more")
     print()
@@ -223,7 +253,7 @@ def main():
     print(f"      Unique bigrams found: {len(bigrams):,}")
 
     # Show top bigrams
-    top_bigrams = sorted(bigrams.items(), key=lambda x: x[1], reverse=True)[:20]
+    top_bigrams = heapq.nlargest(20, bigrams.items(), key=lambda x: x[1])
     print("\n      Top 20 bigrams:")
     for (w1, w2), count in top_bigrams:
         pct = (count / len(domains)) * 100
@@ -272,7 +302,7 @@ def main():
     # Add top keywords that are unambiguous
     for word, count in top_keywords[:50]:
         if count > 1000 and not is_likely_legitimate(word):
-            if any(x in word for x in ["porn", "xxx", "sex", "nude", "adult", "hentai"]):
+            if _UNAMBIGUOUS_RE.search(word):
                 strong.add(word)
 
     for word in sorted(strong):
@@ -305,11 +335,8 @@ def main():
         "porntube", "pornstar", "xxx", "sex", "adult"
     }
 
-    matched = 0
-    for domain in domains:
-        domain_lower = domain.lower()
-        if any(kw in domain_lower for kw in current_keywords):
-            matched += 1
+    current_re = compile_alternation(current_keywords)
+    matched = sum(1 for domain in domains if current_re.search(domain))
 
     current_coverage = (matched / len(domains)) * 100
     print(f"   Current heuristic coverage: {matched:,} / {len(domains):,} ({current_coverage:.1f}%)")
@@ -317,11 +344,8 @@ def main():
     print()
 
     # Estimate coverage with recommended keywords
-    recommended_matched = 0
-    for domain in domains:
-        domain_lower = domain.lower()
-        if any(kw in domain_lower for kw in strong):
-            recommended_matched += 1
+    strong_re = compile_alternation(strong)
+    recommended_matched = sum(1 for domain in domains if strong_re.search(domain))
 
     recommended_coverage = (recommended_matched / len(domains)) * 100
     print(f"   Recommended heuristic coverage: {recommended_matched:,} / {len(domains):,} ({recommended_coverage:.1f}%)")
@@ -5,42 +5,249 @@ Deep analysis to find better heuristic patterns.
 Focus on finding patterns that can cover more domains without false positives.
 """
 
+import multiprocessing as mp
 import re
 from collections import Counter, defaultdict
-from typing import List, Set, Tuple
+from functools import partial
+from itertools import filterfalse
+from typing import Callable, Iterable, Iterator, List, Optional, Set, Tuple
 
-def load_domains(file_path="/tmp/porn_domains.txt") -> List[str]:
-    """Load cached domain list."""
-    with open(file_path, 'r') as f:
-        return [line.strip() for line in f if line.strip()]
+# Current keywords from src/porn_heuristic.rs
+CURRENT_KEYWORDS = {
+    "porn", "xvideo", "xnxx", "hentai", "redtube", "youporn",
+    "spankbang", "xhamster", "brazzers", "bangbros", "porntrex",
+    "porntube", "pornstar", "xxx", "sex", "adult"
+}
 
+# Substrings that veto a keyword match
+FALSE_POSITIVES = ["essex", "sussex", "middlesex", "wessex", "macosx",
+                   "adulteducation", "adultlearning"]
 
-def test_current_heuristic(domain: str) -> bool:
-    """Test if current heuristic would match this domain."""
-    domain_lower = domain.lower()
-
-    # Current keywords from src/porn_heuristic.rs
-    keywords = {
-        "porn", "xvideo", "xnxx", "hentai", "redtube", "youporn",
-        "spankbang", "xhamster", "brazzers", "bangbros", "porntrex",
-        "porntube", "pornstar", "xxx", "sex", "adult"
-    }
 
-    # Check for false positives
-    false_positives = ["essex", "sussex", "middlesex", "wessex", "macosx",
-                       "adulteducation", "adultlearning"]
-    for fp in false_positives:
-        if fp in domain_lower:
-            return False
+def compile_alternation(words: Iterable[str]) -> re.Pattern:
+    """Compile words into one regex that finds any of them in a single scan."""
+    words = sorted(words)
+    if not words:
+        return re.compile(r'(?!)')  # an empty alternation would match everything
+    return re.compile("|".join(map(re.escape, words)))
 
-    # Check keywords
-    return any(kw in domain_lower for kw in keywords)
+
+# Built once at import instead of rebuilding the sets on every call
+_CURRENT_KEYWORD_RE = compile_alternation(CURRENT_KEYWORDS)
+_FALSE_POSITIVE_RE = compile_alternation(FALSE_POSITIVES)
+
+# Explicit fragments marking a common substring as safe to add
+_SAFE_SUBSTRING_RE = compile_alternation(["sex", "porn", "xxx", "nude", "cam", "adult"])
+
+# Adult content fragments for candidate expansion keywords
+_ADULT_INDICATOR_RE = compile_alternation([
+    "cam", "chat", "escort", "nude", "naked", "strip", "bdsm",
+    "fetish", "kinky", "erotic", "amateur", "milf", "teen",
+    "gay", "lesbian", "trans", "shemale", "anal", "oral",
+    "tube", "video", "live", "show", "model", "girl", "boy"
+])
+
+# Words counted as expansion candidates
+_WORD_RE = re.compile(r'[a-z]{3,}')
+
+# Bytes deleted by count_digits
+_ASCII_DIGITS = b'0123456789'
+
+# Domain cores per worker task in the parallel substring passes
+CHUNK_SIZE = 10_000
+
+
+def load_domains(file_path="/tmp/porn_domains.txt") -> List[str]:
+    """Load cached domain list, lowercased once for every consumer."""
+    # Read and split the file in one call instead of iterating line objects
+    with open(file_path, 'rb') as f:
+        lines = f.read().decode('utf-8').lower().split('\n')
+    return [domain for domain in map(str.strip, lines) if domain]
+
+
+def strip_tld(domain: str) -> str:
+    """
+    Drop a trailing ".tld" made of a-z, like re.sub(r'\.[a-z]+$', '', domain)
+    but with one rfind instead of a regex engine call.
+    """
+    i = domain.rfind('.')
+    tld = domain[i + 1:]
+    if i >= 0 and tld.isascii() and tld.isalpha() and tld.islower():
+        return domain[:i]
+    return domain
+
+
+def letter_runs(core: str) -> List[str]:
+    """Return the runs of 3+ str.isalpha() characters in a lowercased core."""
+    if core.isascii():
+        return _WORD_RE.findall(core)
+    # Not [^\W\d_]: that class also accepts numerics such as '²' and 'Ⅻ'
+    runs = ''.join(c if c.isalpha() else ' ' for c in core).split()
+    return [run for run in runs if len(run) >= 3]
+
+
+def get_tld(domain: str) -> str:
+    """Return the trailing [a-z0-9]+ label after the last dot, or "" if there is none."""
+    _, dot, tld = domain.rpartition('.')
+    if dot and tld.isascii() and tld.isalnum() and tld == tld.lower():
+        return tld
+    return ""
+
+
+def count_digits(domain: str) -> int:
+    """Count the digits in domain, like sum(c.isdigit() for c in domain)."""
+    if domain.isascii():
+        # Delete the digits with bytes.translate in C and compare lengths
+        return len(domain) - len(domain.encode('ascii').translate(None, _ASCII_DIGITS))
+    return sum(c.isdigit() for c in domain)
 
 
-def analyze_uncovered_domains(domains: List[str]) -> None:
-    """Analyze domains that are NOT covered by current heuristic."""
+def test_current_heuristic(domain: str) -> bool:
+    """Test if current heuristic would match this (lowercased) domain."""
+    # Check for false positives
+    if _FALSE_POSITIVE_RE.search(domain):
+        return False
 
-    uncovered = [d for d in domains if not test_current_heuristic(d)]
+    # Check keywords
+    return _CURRENT_KEYWORD_RE.search(domain) is not None
+
+
+def find_uncovered_domains(domains: List[str]) -> List[str]:
+    """Return the domains the current heuristic does not match, in order."""
+    # filterfalse drives the predicate from C, without a comprehension frame
+    return list(filterfalse(test_current_heuristic, domains))
+
+
+def _chunked(items: List, size: int) -> Iterator[List]:
+    """Split items into consecutive chunks of at most size items."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _parallel_count(worker: Callable[[List], Counter], items: List) -> Counter:
+    """
+    Run worker over chunks of items in a process pool and merge the
+    per-chunk Counters in input order.
+    """
+    total = Counter()
+
+    with mp.Pool() as pool:
+        for counter in pool.imap(worker, _chunked(items, CHUNK_SIZE)):
+            total.update(counter)
+
+    return total
+
+
+def _weighted_update(counter: Counter, items: List[str], weight: int) -> None:
+    """Add each item to counter weight times."""
+    if weight == 1:
+        counter.update(items)
+    else:
+        for item in items:
+            counter[item] += weight
+
+
+def _frequent_segments(run: str, frequent: Set[str], n: int) -> Iterable[str]:
+    """Yield the maximal slices of run in which every n-char window is in frequent."""
+    start = None
+    for i in range(len(run) - n + 1):
+        if run[i:i+n] in frequent:
+            if start is None:
+                start = i
+        elif start is not None:
+            yield run[start:i-1+n]
+            start = None
+    if start is not None:
+        yield run[start:]
+
+
+def count_common_substrings(
+    core_counts: Counter,
+    min_count: int = 500,
+    min_len: int = 3,
+    max_len: int = 10,
+) -> List[Tuple[str, int]]:
+    """
+    Count the alphabetic substrings of min_len-max_len chars in weighted
+    domain cores and return those seen at least min_count times, most
+    frequent first, ties in order of first occurrence.
+
+    A substring never occurs more often than any of its min_len-char windows
+    (apriori pruning), so after one pass over the short windows, longer
+    substrings are only enumerated inside stretches of frequent windows.
+    A substring is alphabetic iff it lies inside one letter run, so only
+    windows within runs are generated.
+    """
+    core_runs = [(letter_runs(core), weight) for core, weight in core_counts.items()]
+
+    # Pass 1: the shortest substrings, counted in full
+    short_counter = _parallel_count(partial(_count_short_windows, min_len=min_len), core_runs)
+    frequent_short = {s for s, c in short_counter.items() if c >= min_count}
+
+    # Pass 2: longer substrings, only where every short window is frequent
+    long_counter = _parallel_count(
+        partial(_count_long_windows, frequent_short=frequent_short, min_len=min_len, max_len=max_len),
+        core_runs,
+    )
+
+    common = {s: c for s, c in short_counter.items() if c >= min_count}
+    common.update((s, c) for s, c in long_counter.items() if c >= min_count)
+
+    # Rank ties by first occurrence in a length-major scan of each core, the
+    # order a single-pass Counter would hold them in; stop once all are seen.
+    first_seen = {}
+    for runs, _ in core_runs:
+        if len(first_seen) == len(common):
+            break
+        for length in range(min_len, max_len + 1):
+            for run in runs:
+                for i in range(len(run) - length + 1):
+                    substring = run[i:i+length]
+                    if substring in common and substring not in first_seen:
+                        first_seen[substring] = len(first_seen)
+
+    return sorted(common.items(), key=lambda x: (-x[1], first_seen[x[0]]))
+
+
+def _count_short_windows(core_runs: List[Tuple[List[str], int]], min_len: int) -> Counter:
+    """Count the min_len-char windows of one chunk of weighted letter runs."""
+    counter = Counter()
+    for runs, weight in core_runs:
+        _weighted_update(counter, [
+            run[i:i+min_len] for run in runs for i in range(len(run) - min_len + 1)
+        ], weight)
+    return counter
+
+
+def _count_long_windows(
+    core_runs: List[Tuple[List[str], int]],
+    frequent_short: Set[str],
+    min_len: int,
+    max_len: int,
+) -> Counter:
+    """Count one chunk's longer windows inside stretches of frequent short windows."""
+    counter = Counter()
+    for runs, weight in core_runs:
+        substrings = [
+            segment[i:i+length]
+            for run in runs
+            for segment in _frequent_segments(run, frequent_short, min_len)
+            for length in range(min_len + 1, min(len(segment), max_len) + 1)
+            for i in range(len(segment) - length + 1)
+        ]
+        if substrings:
+            _weighted_update(counter, substrings, weight)
+    return counter
+
+
+def analyze_uncovered_domains(domains: List[str], uncovered: Optional[List[str]] = None) -> None:
+    """
+    Analyze domains that are NOT covered by current heuristic.
+
+    Pass uncovered (from find_uncovered_domains) to reuse an existing split.
+    """
+    if uncovered is None:
+        uncovered = find_uncovered_domains(domains)
 
     print(f"Uncovered domains: {len(uncovered):,} / {len(domains):,} ({len(uncovered)/len(domains)*100:.1f}%)")
     print()
@@ -53,11 +260,8 @@ def analyze_uncovered_domains(domains: List[str]) -> None:
 
     # 1. TLD distribution
     print("1. Top TLDs in uncovered domains:")
-    tld_counter = Counter()
-    for domain in uncovered:
-        match = re.search(r'\.([a-z0-9]+)$', domain.lower())
-        if match:
-            tld_counter[match.group(1)] += 1
+    # Counter tallies the whole batch in C instead of one += per domain
+    tld_counter = Counter(filter(None, map(get_tld, uncovered)))
 
     for tld, count in tld_counter.most_common(20):
         pct = (count / len(uncovered)) * 100
@@ -66,23 +270,13 @@ def analyze_uncovered_domains(domains: List[str]) -> None:
 
     # 2. Common substrings (3-10 chars)
     print("2. Common substrings in uncovered domains (min 500 occurrences):")
-    substring_counter = Counter()
-
-    for domain in uncovered[:50000]:  # Sample for performance
-        domain_lower = domain.lower()
-        # Extract domain without TLD
-        domain_core = re.sub(r'\.[a-z]+$', '', domain_lower)
-
-        # Count all substrings of length 3-10
-        for length in range(3, 11):
-            for i in range(len(domain_core) - length + 1):
-                substring = domain_core[i:i+length]
-                if substring.isalpha():  # Only alphabetic
-                    substring_counter[substring] += 1
-
-    # Filter to high-count substrings
-    common_substrings = [(s, c) for s, c in substring_counter.items() if c >= 500]
-    common_substrings.sort(key=lambda x: x[1], reverse=True)
+    # Extract domains without TLD. Identical cores (example.com, example.net)
+    # are enumerated once and weighted.
+    core_counts = Counter(
+        strip_tld(domain)
+        for domain in uncovered[:50000]  # Sample for performance
+    )
+    common_substrings = count_common_substrings(core_counts, min_count=500)
 
     for substring, count in common_substrings[:50]:
         # Test if adding this would cause false positives
@@ -91,7 +285,7 @@ def analyze_uncovered_domains(domains: List[str]) -> None:
             risk_level = "HIGH"
         elif substring in {"tumblr", "blogspot", "blog", "pages"}:
             risk_level = "PLATFORM"
-        elif any(x in substring for x in ["sex", "porn", "xxx", "nude", "cam", "adult"]):
+        elif _SAFE_SUBSTRING_RE.search(substring):
             risk_level = "SAFE"
 
         pct = (count / len(uncovered)) * 100
@@ -100,7 +294,12 @@ def analyze_uncovered_domains(domains: List[str]) -> None:
 
     # 3. Multi-byte patterns (non-ASCII)
     print("3. Non-ASCII domain analysis:")
-    non_ascii = [d for d in uncovered if not d.isascii()]
+    # One C-level check over the joined list settles the common all-ASCII
+    # case; otherwise filterfalse tests each domain without a Python frame
+    if '\n'.join(uncovered).isascii():
+        non_ascii = []
+    else:
+        non_ascii = list(filterfalse(str.isascii, uncovered))
     print(f"   Non-ASCII domains: {len(non_ascii):,} ({len(non_ascii)/len(uncovered)*100:.1f}%)")
     if non_ascii:
         print(f"   Examples: {', '.join(non_ascii[:10])}")
@@ -122,7 +321,7 @@ def analyze_uncovered_domains(domains: List[str]) -> None:
 
     for domain in uncovered:
         for platform in platforms:
-            if platform in domain.lower():
+            if platform in domain:
                 platforms[platform] += 1
 
     print("   Platform subdomain counts:")
@@ -134,7 +333,7 @@ def analyze_uncovered_domains(domains: List[str]) -> None:
 
     # 5. Number patterns
     print("5. Number-heavy domains:")
-    number_heavy = [d for d in uncovered if sum(c.isdigit() for c in d) >= 4]
+    number_heavy = [d for d in uncovered if count_digits(d) >= 4]
     print(f"   Domains with 4+ digits: {len(number_heavy):,} ({len(number_heavy)/len(uncovered)*100:.1f}%)")
     if number_heavy:
         print(f"   Examples: {', '.join(number_heavy[:10])}")
@@ -144,12 +343,9 @@ def analyze_uncovered_domains(domains: List[str]) -> None:
     print("6. Candidate keywords for expansion (appearing in 1000+ uncovered domains):")
 
     # Extract all words
-    word_counter = Counter()
-    for domain in uncovered:
-        # Tokenize
-        tokens = re.findall(r'[a-z]{3,}', domain.lower())
-        for token in tokens:
-            word_counter[token] += 1
+    # Newlines never occur inside a word, so one findall over the joined list
+    # tokenizes every domain and Counter counts the tokens in C
+    word_counter = Counter(_WORD_RE.findall('\n'.join(uncovered)))
 
     # Filter for adult content keywords
     adult_indicators = []
@@ -166,12 +362,7 @@ def analyze_uncovered_domains(domains: List[str]) -> None:
             continue
 
         # Look for adult content patterns
-        if any(indicator in word for indicator in [
-            "cam", "chat", "escort", "nude", "naked", "strip", "bdsm",
-            "fetish", "kinky", "erotic", "amateur", "milf", "teen",
-            "gay", "lesbian", "trans", "shemale", "anal", "oral",
-            "tube", "video", "live", "show", "model", "girl", "boy"
-        ]):
+        if _ADULT_INDICATOR_RE.search(word):
             adult_indicators.append((word, count))
 
     adult_indicators.sort(key=lambda x: x[1], reverse=True)
@@ -182,38 +373,41 @@ def analyze_uncovered_domains(domains: List[str]) -> None:
     print()
 
 
-def estimate_expanded_coverage(domains: List[str], new_keywords: Set[str]) -> None:
-    """Estimate coverage with expanded keyword list."""
+def estimate_expanded_coverage(
+    domains: List[str],
+    new_keywords: Set[str],
+    uncovered: Optional[List[str]] = None,
+) -> None:
+    """
+    Estimate coverage with expanded keyword list.
+
+    The expanded list is a superset of the current one with the same false
+    positive veto, so every currently covered domain stays covered and only
+    the uncovered domains need to be rescanned.
+    """
+    if uncovered is None:
+        uncovered = find_uncovered_domains(domains)
+
     print("=" * 80)
     print("COVERAGE ESTIMATION WITH EXPANDED KEYWORDS")
     print("=" * 80)
     print()
 
-    current_keywords = {
-        "porn", "xvideo", "xnxx", "hentai", "redtube", "youporn",
-        "spankbang", "xhamster", "brazzers", "bangbros", "porntrex",
-        "porntube", "pornstar", "xxx", "sex", "adult"
-    }
-
     # Test current
-    current_matched = sum(1 for d in domains if test_current_heuristic(d))
+    current_matched = len(domains) - len(uncovered)
     current_pct = (current_matched / len(domains)) * 100
 
     # Test with new keywords
-    all_keywords = current_keywords | new_keywords
-
-    new_matched = 0
-    for domain in domains:
-        domain_lower = domain.lower()
+    all_keywords_re = compile_alternation(CURRENT_KEYWORDS | new_keywords)
 
+    new_matched = current_matched
+    for domain in uncovered:
         # Check false positives
-        false_positives = ["essex", "sussex", "middlesex", "wessex", "macosx",
-                           "adulteducation", "adultlearning"]
-        if any(fp in domain_lower for fp in false_positives):
+        if _FALSE_POSITIVE_RE.search(domain):
             continue
 
         # Check all keywords
-        if any(kw in domain_lower for kw in all_keywords):
+        if all_keywords_re.search(domain):
             new_matched += 1
 
     new_pct = (new_matched / len(domains)) * 100
@@ -238,7 +432,8 @@ def main():
     print()
 
     # Analyze what we're missing
-    analyze_uncovered_domains(domains)
+    uncovered = find_uncovered_domains(domains)
+    analyze_uncovered_domains(domains, uncovered)
 
     # Propose new keywords
     print("=" * 80)
@@ -285,7 +480,7 @@ def main():
     print()
 
     # Estimate impact
-    estimate_expanded_coverage(domains, recommended)
+    estimate_expanded_coverage(domains, recommended, uncovered)
 
 
 if __name__ == "__main__":
@@ -12,28 +12,85 @@ Focus on:
 7. Platform/format terms (cam, webcam, tube, live)
 """
 
+import io
+import multiprocessing as mp
 import re
+import sys
 from collections import Counter
-from typing import List, Set, Dict, Tuple
+from contextlib import redirect_stdout
+from functools import partial
+from itertools import chain, filterfalse
+from typing import Callable, Dict, Iterator, List, Set, Tuple, TypeVar
+
+# Trailing TLD at the end of each line of a joined list. The TLD has to go
+# before tokenizing rather than being filtered out after: xxx, porn, sex,
+# cam, live and video are real TLDs and counted terms. The (?![^\n])
+# end-of-line test is cheaper than a MULTILINE $.
+_TLD_RE = re.compile(r'\.[a-z0-9]+(?![^\n])')
+
+# Alphabetic tokens (3+ chars)
+_TOKEN_RE = re.compile(r'[a-z]{3,}')
+
+# Numeric patterns, one group each so a match's lastindex names the pattern.
+# All of them start at a word boundary, which is checked once, and the
+# lookahead skips positions that cannot begin any of them. Domains are
+# lowercased at load, so 3x and xxx need no IGNORECASE.
+_NUMERIC_NAMES = ["3x", "69", "18+", "21+", "xxx"]
+_NUMERIC_RE = re.compile(r'(?=[1236x])\b(?:(3x)\b|(69)\b|(18\+)|(21\+)|(xxx)\b)')
+
+# Domains per worker task in the parallel scans
+CHUNK_SIZE = 10_000
+
+T = TypeVar('T')
 
 
 def load_domains(file_path="/tmp/porn_domains.txt") -> List[str]:
-    """Load cached domain list."""
-    with open(file_path, 'r') as f:
-        return [line.strip() for line in f if line.strip()]
+    """
+    Load cached domain list, lowercased once for every consumer and with
+    duplicates dropped (first occurrence kept), so every count is per
+    distinct domain.
+    """
+    # Read and split the file in one call instead of iterating line objects
+    with open(file_path, 'rb') as f:
+        lines = f.read().decode('utf-8').lower().split('\n')
+    # Merged blocklists repeat domains; scanning each once is all the counts need
+    return list(dict.fromkeys(domain for domain in map(str.strip, lines) if domain))
+
+
+def compile_alternation(words) -> re.Pattern:
+    """Compile words into one regex that finds any of them in a single scan."""
+    words = sorted(words)
+    if not words:
+        return re.compile(r'(?!)')  # an empty alternation would match everything
+    return re.compile("|".join(map(re.escape, words)))
+
+
+def _chunked(items: List, size: int) -> Iterator[List]:
+    """Split items into consecutive chunks of at most size items."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _parallel_map(worker: Callable[[List], T], items: List) -> Iterator[T]:
+    """Run worker over chunks of items in a process pool, yielding results in input order."""
+    with mp.Pool() as pool:
+        yield from pool.imap(worker, _chunked(items, CHUNK_SIZE))
 
 
-def tokenize(domain: str) -> Set[str]:
-    """Extract all words from domain."""
-    domain_lower = domain.lower()
-    # Remove TLD
-    domain_core = re.sub(r'\.[a-z0-9]+$', '', domain_lower)
-    # Extract alphabetic tokens (3+ chars)
-    tokens = re.findall(r'[a-z]{3,}', domain_core)
-    return set(tokens)
+def _parallel_count(worker: Callable[[List], Counter], items: List) -> Counter:
+    """
+    Run worker over chunks of items in a process pool and merge the
+    per-chunk Counters in input order, so first-seen order is kept.
+    """
+    total = Counter()
 
+    for counter in _parallel_map(worker, items):
+        total.update(counter)
 
-def analyze_porn_terminology(domains: List[str]) -> Dict[str, int]:
+    return total
+
+
+def analyze_porn_terminology(domains: List[str]) -> Tuple[Counter, Dict[str, frozenset], int]:
     """Extract porn-specific terminology with frequency counts."""
 
     # Porn industry terminology categories
@@ -108,69 +165,104 @@ def analyze_porn_terminology(domains: List[str]) -> Dict[str, int]:
         },
     }
 
-    # Flatten all terms
-    all_terms = set()
-    for category_terms in terminology.values():
-        all_terms.update(category_terms)
+    # Freeze the categories and flatten all terms once; the flat set is
+    # what each worker looks tokens up in
+    terminology = {category: frozenset(terms) for category, terms in terminology.items()}
+    all_terms = frozenset().union(*terminology.values())
 
     # Count occurrences
-    term_counts = Counter()
-
     print(f"Analyzing {len(domains):,} domains for porn terminology...")
-    for i, domain in enumerate(domains):
-        if i % 100000 == 0:
-            print(f"  Progress: {i:,}/{len(domains):,}")
 
-        tokens = tokenize(domain)
-        for token in tokens:
-            if token in all_terms:
-                term_counts[token] += 1
+    # The same pass also counts the domains that contain at least one term
+    term_counts = Counter()
+    matched_domains = 0
+    for chunk_counts, chunk_matched in _parallel_map(partial(_count_terms_chunk, all_terms), domains):
+        term_counts.update(chunk_counts)
+        matched_domains += chunk_matched
 
     print()
-    return dict(term_counts), terminology
+    return term_counts, terminology, matched_domains
 
 
-def find_numeric_patterns(domains: List[str]) -> Counter:
-    """Find numeric patterns like 3x, 69, etc."""
-    pattern_counter = Counter()
+def _count_terms_chunk(all_terms: Set[str], domains: List[str]) -> Tuple[Counter, int]:
+    """
+    Count the domains in one chunk whose words (3+ letter runs, TLD removed)
+    include each term, and the domains that include any term at all.
+    """
+    # TLD stripping runs once over the newline-joined chunk instead of once
+    # per domain. Tokenizing and the per-domain term lookup are chained map
+    # calls, so every step runs as a C loop with no Python frame per domain
+    # or token; intersection also dedups each domain's hits.
+    blob = _TLD_RE.sub('', '\n'.join(domains))
+    domain_hits = list(map(all_terms.intersection, map(_TOKEN_RE.findall, blob.split('\n'))))
+    return Counter(chain.from_iterable(domain_hits)), sum(map(bool, domain_hits))
 
-    patterns = {
-        "3x": re.compile(r'\b3x\b', re.IGNORECASE),
-        "69": re.compile(r'\b69\b'),
-        "18+": re.compile(r'\b18\+'),
-        "21+": re.compile(r'\b21\+'),
-        "xxx": re.compile(r'\bxxx\b', re.IGNORECASE),
-    }
+
+def _count_numeric_chunk(domains: List[str]) -> Counter:
+    """Count the domains in one chunk that contain each numeric pattern."""
+    pattern_counter = Counter()
 
     for domain in domains:
-        for name, pattern in patterns.items():
-            if pattern.search(domain):
-                pattern_counter[name] += 1
+        if _NUMERIC_RE.search(domain):
+            # Matches are whole words, so they never overlap and finditer
+            # sees every one; hits are applied in pattern order.
+            hits = {m.lastindex for m in _NUMERIC_RE.finditer(domain)}
+            pattern_counter.update(_NUMERIC_NAMES[i - 1] for i in sorted(hits))
 
     return pattern_counter
 
 
+def find_numeric_patterns(domains: List[str]) -> Counter:
+    """Find numeric patterns like 3x, 69, etc. in lowercased domains."""
+    return _parallel_count(_count_numeric_chunk, domains)
+
+
 def find_compound_terms(domains: List[str], min_count: int = 100) -> Counter:
     """Find compound porn terms like sexshop, pornhub, etc."""
-    compound_counter = Counter()
-
     # Common prefixes and suffixes in porn domains
     prefixes = ["sex", "porn", "xxx", "hot", "live", "free", "real", "true"]
     suffixes = ["sex", "porn", "hub", "tube", "cam", "show", "site", "zone", "land"]
 
-    for domain in domains:
-        domain_lower = domain.lower()
+    # All prefix+suffix combinations, ranked in the order they used to be checked
+    compounds = [prefix + suffix for prefix in prefixes for suffix in suffixes if prefix != suffix]
+    rank = {compound: i for i, compound in enumerate(compounds)}
 
-        # Check for prefix+suffix combinations
-        for prefix in prefixes:
-            for suffix in suffixes:
-                compound = prefix + suffix
-                if compound in domain_lower and prefix != suffix:
-                    compound_counter[compound] += 1
+    # One pass per domain finds every prefix+suffix pair; the lookahead lets
+    # matches overlap, as separate substring checks would (e.g. sexporn and
+    # pornhub in sexpornhub). No prefix starts another prefix or suffix starts
+    # another suffix, so at most one pair can begin at each position. Pairs
+    # of a word with itself (sexsex) are matched but dropped by the rank filter.
+    compound_re = re.compile(f"(?=((?:{'|'.join(prefixes)})(?:{'|'.join(suffixes)})))")
+    compound_counter = _parallel_count(partial(_count_compounds_chunk, compound_re, rank), domains)
 
     return Counter({term: count for term, count in compound_counter.items() if count >= min_count})
 
 
+def _count_compounds_chunk(compound_re: re.Pattern, rank: Dict[str, int], domains: List[str]) -> Counter:
+    """Count the domains in one chunk (lowercased) that contain each ranked compound."""
+    compound_counter = Counter()
+
+    for domain in filter(compound_re.search, domains):
+        hits = rank.keys() & compound_re.findall(domain)
+        compound_counter.update(sorted(hits, key=rank.__getitem__))
+
+    return compound_counter
+
+
+def _count_coverage_chunk(current_re: re.Pattern, extra_re: re.Pattern, domains: List[str]) -> Counter:
+    """
+    Count the (lowercased) domains in one chunk matched by the current
+    keywords, and by the current keywords plus the extra terms.
+    """
+    # A current keyword match counts for both; the extra terms are only
+    # searched for in domains the current keywords miss
+    missed = list(filterfalse(current_re.search, domains))
+    current_matches = len(domains) - len(missed)
+    all_matches = current_matches + sum(1 for _ in filter(extra_re.search, missed))
+
+    return Counter({"current": current_matches, "all": all_matches})
+
+
 def main():
     print("=" * 80)
     print("PORN INDUSTRY TERMINOLOGY EXTRACTION")
@@ -183,120 +275,130 @@ def main():
     print()
 
     # Analyze terminology
-    term_counts, terminology = analyze_porn_terminology(domains)
+    term_counts, terminology, total_matches = analyze_porn_terminology(domains)
 
-    print("=" * 80)
-    print("RESULTS BY CATEGORY")
-    print("=" * 80)
-    print()
+    # Numeric patterns and compound terms
+    numeric = find_numeric_patterns(domains)
+    compounds = find_compound_terms(domains, min_count=100)
 
-    # Sort terms by category
-    for category, terms in terminology.items():
-        print(f"{category.upper().replace('_', ' ')}:")
-        print("-" * 60)
+    # Terms by frequency, ranked once for the top list and both confidence tiers
+    ranked_terms = term_counts.most_common()
 
-        # Get counts for terms in this category
-        category_counts = {term: term_counts.get(term, 0) for term in terms}
-        sorted_terms = sorted(category_counts.items(), key=lambda x: x[1], reverse=True)
+    # High-confidence terms (500+ occurrences, zero false positive risk)
+    high_conf = [(term, count) for term, count in ranked_terms if count >= 500]
 
-        # Show all terms with their counts
-        for term, count in sorted_terms:
-            if count > 0:
-                pct = (count / len(domains)) * 100
-                print(f"  {term:20s} {count:>8,} ({pct:5.2f}%)")
+    # Current keywords
+    current = {"porn", "xvideo", "xnxx", "hentai", "redtube", "youporn",
+               "spankbang", "xhamster", "brazzers", "bangbros", "porntrex",
+               "porntube", "pornstar", "xxx", "sex", "adult"}
 
+    # Current keywords alone and with high-confidence terms, both counted in
+    # one pass with one alternation search per domain for each term set
+    current_re = compile_alternation(current)
+    extra_re = compile_alternation({term for term, _ in high_conf} - current)
+    coverage = _parallel_count(partial(_count_coverage_chunk, current_re, extra_re), domains)
+    current_matches = coverage["current"]
+    all_matches = coverage["all"]
+
+    # The report is a few hundred short lines: once the scans are done,
+    # build it in memory and write it with one call
+    report = io.StringIO()
+    with redirect_stdout(report):
+        print("=" * 80)
+        print("RESULTS BY CATEGORY")
+        print("=" * 80)
         print()
 
-    # Numeric patterns
-    print("NUMERIC PATTERNS:")
-    print("-" * 60)
-    numeric = find_numeric_patterns(domains)
-    for pattern, count in numeric.most_common():
-        pct = (count / len(domains)) * 100
-        print(f"  {pattern:20s} {count:>8,} ({pct:5.2f}%)")
-    print()
+        # Sort terms by category
+        for category, terms in terminology.items():
+            print(f"{category.upper().replace('_', ' ')}:")
+            print("-" * 60)
 
-    # Compound terms
-    print("COMPOUND TERMS (100+ occurrences):")
-    print("-" * 60)
-    compounds = find_compound_terms(domains, min_count=100)
-    for term, count in compounds.most_common(30):
-        pct = (count / len(domains)) * 100
-        print(f"  {term:20s} {count:>8,} ({pct:5.2f}%)")
-    print()
+            # Get counts for terms in this category
+            category_counts = {term: term_counts.get(term, 0) for term in terms}
+            sorted_terms = sorted(category_counts.items(), key=lambda x: x[1], reverse=True)
 
-    # Summary statistics
-    print("=" * 80)
-    print("SUMMARY STATISTICS")
-    print("=" * 80)
-    print()
+            # Show all terms with their counts
+            for term, count in sorted_terms:
+                if count > 0:
+                    pct = (count / len(domains)) * 100
+                    print(f"  {term:20s} {count:>8,} ({pct:5.2f}%)")
 
-    total_matches = sum(1 for d in domains if any(tokenize(d) & set(term_counts.keys())))
-    coverage_pct = (total_matches / len(domains)) * 100
+            print()
 
-    print(f"Total unique terms found: {len(term_counts)}")
-    print(f"Domains matching at least one term: {total_matches:,} ({coverage_pct:.2f}%)")
-    print()
+        # Numeric patterns
+        print("NUMERIC PATTERNS:")
+        print("-" * 60)
+        for pattern, count in numeric.most_common():
+            pct = (count / len(domains)) * 100
+            print(f"  {pattern:20s} {count:>8,} ({pct:5.2f}%)")
+        print()
 
-    # Top terms overall
-    print("TOP 50 TERMS (by frequency):")
-    print("-" * 60)
-    for term, count in sorted(term_counts.items(), key=lambda x: x[1], reverse=True)[:50]:
-        pct = (count / len(domains)) * 100
-        print(f"  {term:20s} {count:>8,} ({pct:5.2f}%)")
-    print()
+        # Compound terms
+        print("COMPOUND TERMS (100+ occurrences):")
+        print("-" * 60)
+        for term, count in compounds.most_common(30):
+            pct = (count / len(domains)) * 100
+            print(f"  {term:20s} {count:>8,} ({pct:5.2f}%)")
+        print()
 
-    # Recommendations
-    print("=" * 80)
-    print("RECOMMENDATIONS FOR HEURISTIC RULES")
-    print("=" * 80)
-    print()
+        # Summary statistics
+        print("=" * 80)
+        print("SUMMARY STATISTICS")
+        print("=" * 80)
+        print()
 
-    # High-confidence terms (500+ occurrences, zero false positive risk)
-    high_conf = [(term, count) for term, count in term_counts.items() if count >= 500]
-    high_conf.sort(key=lambda x: x[1], reverse=True)
+        coverage_pct = (total_matches / len(domains)) * 100
 
-    print(f"HIGH CONFIDENCE TERMS (500+ occurrences, {len(high_conf)} terms):")
-    print()
-    print("```rust")
-    print("const PORN_TERMINOLOGY: &[&str] = &[")
-    for term, count in high_conf:
-        print(f'    "{term}",  // {count:,} occurrences')
-    print("];")
-    print("```")
-    print()
+        print(f"Total unique terms found: {len(term_counts)}")
+        print(f"Domains matching at least one term: {total_matches:,} ({coverage_pct:.2f}%)")
+        print()
 
-    # Medium-confidence terms (100-499 occurrences)
-    med_conf = [(term, count) for term, count in term_counts.items() if 100 <= count < 500]
-    med_conf.sort(key=lambda x: x[1], reverse=True)
+        # Top terms overall
+        print("TOP 50 TERMS (by frequency):")
+        print("-" * 60)
+        for term, count in ranked_terms[:50]:
+            pct = (count / len(domains)) * 100
+            print(f"  {term:20s} {count:>8,} ({pct:5.2f}%)")
+        print()
 
-    print(f"MEDIUM CONFIDENCE TERMS (100-499 occurrences, {len(med_conf)} terms):")
-    print(f"  (Recommend manual review for false positives)")
-    for term, count in med_conf[:20]:
-        print(f"  {term:20s} {count:>6,}")
-    if len(med_conf) > 20:
-        print(f"  ... and {len(med_conf) - 20} more")
-    print()
+        # Recommendations
+        print("=" * 80)
+        print("RECOMMENDATIONS FOR HEURISTIC RULES")
+        print("=" * 80)
+        print()
 
-    # Coverage estimation
-    print("COVERAGE ESTIMATION:")
-    print()
+        print(f"HIGH CONFIDENCE TERMS (500+ occurrences, {len(high_conf)} terms):")
+        print()
+        print("```rust")
+        print("const PORN_TERMINOLOGY: &[&str] = &[")
+        for term, count in high_conf:
+            print(f'    "{term}",  // {count:,} occurrences')
+        print("];")
+        print("```")
+        print()
 
-    # Current keywords
-    current = {"porn", "xvideo", "xnxx", "hentai", "redtube", "youporn",
-               "spankbang", "xhamster", "brazzers", "bangbros", "porntrex",
-               "porntube", "pornstar", "xxx", "sex", "adult"}
+        # Medium-confidence terms (100-499 occurrences)
+        med_conf = [(term, count) for term, count in ranked_terms if 100 <= count < 500]
 
-    current_matches = sum(1 for d in domains if any(t in d.lower() for t in current))
+        print(f"MEDIUM CONFIDENCE TERMS (100-499 occurrences, {len(med_conf)} terms):")
+        print(f"  (Recommend manual review for false positives)")
+        for term, count in med_conf[:20]:
+            print(f"  {term:20s} {count:>6,}")
+        if len(med_conf) > 20:
+            print(f"  ... and {len(med_conf) - 20} more")
+        print()
 
-    # With high-confidence terms
-    all_terms = current | {term for term, _ in high_conf}
-    all_matches = sum(1 for d in domains if any(t in d.lower() for t in all_terms))
+        # Coverage estimation
+        print("COVERAGE ESTIMATION:")
+        print()
 
-    print(f"Current keywords:          {current_matches:>8,} / {len(domains):,} ({current_matches/len(domains)*100:5.2f}%)")
-    print(f"+ High-conf terminology:   {all_matches:>8,} / {len(domains):,} ({all_matches/len(domains)*100:5.2f}%)")
-    print(f"Improvement:               {all_matches - current_matches:>8,} domains (+{(all_matches - current_matches)/len(domains)*100:.2f}%)")
-    print()
+        print(f"Current keywords:          {current_matches:>8,} / {len(domains):,} ({current_matches/len(domains)*100:5.2f}%)")
+        print(f"+ High-conf terminology:   {all_matches:>8,} / {len(domains):,} ({all_matches/len(domains)*100:5.2f}%)")
+        print(f"Improvement:               {all_matches - current_matches:>8,} domains (+{(all_matches - current_matches)/len(domains)*100:.2f}%)")
+        print()
+
+    sys.stdout.write(report.getvalue())
 
 
 if __name__ == "__main__":